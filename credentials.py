@@ -0,0 +1,70 @@
+import os
+
+from dotenv import dotenv_values
+
+TOKEN_VARIABLE = 'yandex_token'
+
+
+class Credentials:
+    """Токен Практикума, который перечитывается без перезапуска бота.
+
+    Токен берётся из переменной `yandex_token` файла `path`, а если в
+    файле её нет — из `environ`; файл перечитывается, когда у него
+    меняется время изменения. В `environ` должно лежать окружение процесса
+    без значений, скопированных из файла, иначе удалённый из файла токен
+    продолжит действовать. Заголовки собираются заранее и подменяются
+    целиком, поэтому опрос всегда видит согласованный набор.
+    """
+
+    def __init__(self, path, environ=os.environ):
+        self.path = path
+        self.environ = environ
+        self.prebuilt = None
+        self.paused = None
+        self.mtime = self.stat()
+        self.load(self.read_file())
+
+    def stat(self):
+        """Возвращает время изменения файла или None, если его нет."""
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def read_file(self):
+        """Читает переменные из файла с токеном."""
+        if self.mtime is None:
+            return {}
+        try:
+            return dotenv_values(self.path)
+        except OSError:
+            return {}
+
+    def load(self, values):
+        """Собирает заголовки и снимает паузу, если токен сменился."""
+        token = (values.get(TOKEN_VARIABLE)
+                 or self.environ.get(TOKEN_VARIABLE) or '')
+        self.prebuilt = {'Authorization': f'OAuth {token}'}
+        if self.paused != self.prebuilt:
+            self.paused = None
+
+    def reload(self):
+        """Перечитывает файл с токеном, если он изменился."""
+        mtime = self.stat()
+        if mtime == self.mtime:
+            return False
+        self.mtime = mtime
+        self.load(self.read_file())
+        return True
+
+    def headers(self):
+        """Возвращает заголовки запроса к API."""
+        return self.prebuilt
+
+    def is_paused(self):
+        """Проверяет, отложен ли опрос после отказа в доступе."""
+        return self.paused is not None
+
+    def pause(self):
+        """Откладывает опрос до смены токена."""
+        self.paused = self.prebuilt
@@ -0,0 +1,35 @@
+DIGEST_HEADER = 'Сводка изменений статусов ({count}):'
+
+
+def format_digest(messages):
+    """Собирает несколько сообщений в одну сводку."""
+    if len(messages) == 1:
+        return messages[0]
+    lines = [DIGEST_HEADER.format(count=len(messages))]
+    lines += [f'• {message}' for message in messages]
+    return '\n'.join(lines)
+
+
+def group_messages(entries, now, interval, max_size, urgent=frozenset()):
+    """Собирает из записей очереди сообщения к отправке.
+
+    Записи со срочными статусами уходят отдельными сообщениями сразу.
+    Остальные копятся по чатам и уходят одной сводкой, когда самой старой
+    записи исполнилось `interval` секунд или записей набралось `max_size`.
+    Возвращает список троек (chat_id, ключи записей, текст).
+    """
+    sends = []
+    buffers = {}
+    for key, chat_id, status, message, created in entries:
+        if status in urgent:
+            sends.append((chat_id, [key], message))
+        else:
+            buffers.setdefault(chat_id, []).append((key, message, created))
+    for chat_id, buffered in buffers.items():
+        for start in range(0, len(buffered), max_size):
+            chunk = buffered[start:start + max_size]
+            if len(chunk) < max_size and now - chunk[0][2] < interval:
+                break
+            sends.append((chat_id, [key for key, _, _ in chunk],
+                          format_digest([message for _, message, _ in chunk])))
+    return sends
@@ -2,3 +2,41 @@ class TelegramSendMessageError(Exception):
     """Ошибка отправки сообщения в телеграм."""
 
     pass
+
+
+class UnauthorizedError(ConnectionError):
+    """API Практикума отклонило токен."""
+
+    pass
+
+
+class ResponseValidationError(Exception):
+    """Ответ API не соответствует схеме.
+
+    В `errors` лежат все найденные ошибки в виде пар (путь, описание).
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(errors)
+
+    def __str__(self):
+        return '; '.join(f'{path}: {message}' for path, message in self.errors)
+
+
+class ResponseTypeError(ResponseValidationError, TypeError):
+    """Значение в ответе API имеет неверный тип."""
+
+    pass
+
+
+class ResponseKeyError(ResponseValidationError, KeyError):
+    """В ответе API отсутствует обязательный ключ."""
+
+    pass
+
+
+class ResponseValueError(ResponseValidationError, ValueError):
+    """Значение в ответе API не входит в список допустимых."""
+
+    pass
@@ -0,0 +1,104 @@
+import json
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class Heartbeat:
+    """Состояние основного цикла для проверок живости.
+
+    Цикл считается зависшим, если он занят дольше `max_busy` секунд или
+    проспал назначенный срок пробуждения больше чем на `max_busy` секунд.
+    """
+
+    def __init__(self, max_busy, clock=time.monotonic):
+        self.max_busy = max_busy
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.busy_since = clock()
+        self.wake_at = None
+        self.last_poll = None
+        self.last_send = None
+        self.gauges = {}
+
+    def busy(self):
+        """Отмечает начало работы цикла."""
+        with self.lock:
+            self.busy_since = self.clock()
+
+    def idle(self, wake_at):
+        """Отмечает, что цикл уснул до `wake_at` по часам `clock`."""
+        with self.lock:
+            self.busy_since = None
+            self.wake_at = wake_at
+
+    def polled(self):
+        """Запоминает время успешного опроса API."""
+        with self.lock:
+            self.last_poll = time.time()
+
+    def sent(self):
+        """Запоминает время успешной отправки сообщения."""
+        with self.lock:
+            self.last_send = time.time()
+
+    def set_gauge(self, name, value):
+        """Обновляет показатель вроде длины очереди."""
+        with self.lock:
+            self.gauges[name] = value
+
+    def is_alive(self):
+        """Проверяет, что цикл не завис."""
+        with self.lock:
+            now = self.clock()
+            if self.busy_since is not None:
+                return now - self.busy_since <= self.max_busy
+            if self.wake_at is None:
+                return True
+            return now - self.wake_at <= self.max_busy
+
+    def is_ready(self):
+        """Проверяет, что цикл жив и хотя бы раз опросил API."""
+        return self.last_poll is not None and self.is_alive()
+
+    def snapshot(self):
+        """Возвращает состояние цикла для отчёта."""
+        alive = self.is_alive()
+        with self.lock:
+            return {
+                'alive': alive,
+                'busy': self.busy_since is not None,
+                'last_poll': self.last_poll,
+                'last_send': self.last_send,
+                **self.gauges,
+            }
+
+
+def serve_health(heartbeat, port, host=''):
+    """Запускает HTTP-сервер с /healthz и /readyz в фоновом потоке."""
+    checks = {'/healthz': heartbeat.is_alive, '/readyz': heartbeat.is_ready}
+
+    class HealthHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            check = checks.get(self.path)
+            if check is None:
+                self.send_error(HTTPStatus.NOT_FOUND)
+                return
+            status = (HTTPStatus.OK if check()
+                      else HTTPStatus.SERVICE_UNAVAILABLE)
+            body = json.dumps(heartbeat.snapshot()).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), HealthHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
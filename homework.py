@@ -1,6 +1,8 @@
 import logging
 import os
+import signal
 import sys
+import threading
 import time
 from http import HTTPStatus
 
@@ -8,9 +10,20 @@ import requests
 import telegram
 from dotenv import load_dotenv
 from telegram import TelegramError
+from telegram.error import BadRequest, Unauthorized
 
-from exceptions import TelegramSendMessageError
+from credentials import Credentials
+from digest import group_messages
+from exceptions import (ResponseValidationError, TelegramSendMessageError,
+                        UnauthorizedError)
+from health import Heartbeat, serve_health
+from outbox import Outbox, make_key
+from schema import compile_schema
+from scheduler import Scheduler
+from statuses import StatusTable
 
+# Окружение процесса до load_dotenv, без скопированных из файла значений.
+PROCESS_ENVIRON = dict(os.environ)
 load_dotenv()
 
 
@@ -19,8 +32,33 @@ TELEGRAM_TOKEN = os.getenv('telegram_token')
 TELEGRAM_CHAT_ID = os.getenv('chat_id')
 
 RETRY_TIME = 600
+DEFAULT_SUBSCRIPTION = 'default'
+API_TIMEOUT = 10
+API_READ_TIMEOUT = 5
+API_CHUNK_SIZE = 8192
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
-HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+CREDENTIALS_PATH = os.getenv('credentials_path', '.env')
+
+OUTBOX_PATH = os.getenv('outbox_path', 'outbox.sqlite3')
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_RETENTION = 7 * 24 * 60 * 60
+
+# Heroku убивает процесс через 30 секунд после SIGTERM, а сигнал может
+# прийти во время опроса. Последнее чтение тела начинается не позже
+# API_TIMEOUT с начала запроса и длится не дольше API_READ_TIMEOUT, поэтому
+# API_TIMEOUT + API_READ_TIMEOUT + SHUTDOWN_TIMEOUT < 30. Сервер, который
+# по байту присылает заголовки, этим не ограничен: на них действует только
+# API_READ_TIMEOUT на каждое чтение.
+SHUTDOWN_TIMEOUT = int(os.getenv('shutdown_timeout', 10))
+
+DIGEST_INTERVAL = int(os.getenv('digest_interval', 0))
+DIGEST_MAX_SIZE = 20
+DIGEST_URGENT = frozenset(
+    status for status in os.getenv('digest_urgent', '').split(',') if status
+)
+
+HEALTH_PORT = os.getenv('health_port')
+HEALTH_MAX_BUSY = 4 * API_TIMEOUT
 
 
 HOMEWORK_VERDICTS = {
@@ -29,6 +67,17 @@ HOMEWORK_VERDICTS = {
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
 
+credentials = Credentials(CREDENTIALS_PATH, PROCESS_ENVIRON)
+
+validate_response = compile_schema({
+    'homeworks': [dict],
+    'current_date': int,
+})
+validate_homework = compile_schema({
+    'homework_name': str,
+    'status': set(HOMEWORK_VERDICTS),
+}, name='homework')
+
 
 def send_message(bot, message):
     """Отправляет сообщение о результатах ревью."""
@@ -43,87 +92,259 @@ def send_message(bot, message):
         logging.info('Сообщение в чат успешно отправлено')
 
 
+def report_error(bot, message):
+    """Пишет сбой в лог и пытается сообщить о нём в чат."""
+    logging.error(message)
+    try:
+        send_message(bot, message)
+    except TelegramSendMessageError:
+        logging.error(
+            'Произошла ошибка отправки сообщения, подробности: ',
+            exc_info=True
+        )
+
+
+def read_body(response, deadline):
+    """Дочитывает тело ответа, пока не наступил `deadline`.
+
+    `timeout` у requests ограничивает каждое чтение, а не весь ответ,
+    поэтому сервер, присылающий тело по байту, задержал бы опрос сколь
+    угодно долго. `read1` отдаёт то, что уже пришло, и срок проверяется
+    перед каждым чтением. Ответ без потокового тела остаётся как есть.
+    """
+    raw = getattr(response, 'raw', None)
+    if raw is None:
+        return
+    chunks = []
+    try:
+        while True:
+            if time.monotonic() > deadline:
+                raise requests.Timeout(
+                    f'ответ не получен за {API_TIMEOUT} секунд'
+                )
+            chunk = raw.read1(API_CHUNK_SIZE, decode_content=True)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        response.close()
+    response._content = b''.join(chunks)
+
+
 def get_api_answer(current_timestamp):
     """Получает запрос с API."""
-    params = dict(url=ENDPOINT, headers=HEADERS,
-                  params={'from_date': current_timestamp})
+    params = dict(url=ENDPOINT, headers=credentials.headers(),
+                  params={'from_date': current_timestamp},
+                  timeout=API_READ_TIMEOUT, stream=True)
+    deadline = time.monotonic() + API_TIMEOUT
     try:
         response = requests.get(**params)
+        if response.status_code == HTTPStatus.UNAUTHORIZED:
+            raise UnauthorizedError('токен отклонён')
         if response.status_code != HTTPStatus.OK:
             raise ConnectionError('cайт недоступен')
+        read_body(response, deadline)
         return response.json()
+    except UnauthorizedError:
+        raise
     except Exception as error:
-        raise ConnectionError(f'Ошибка при запросе {params}: {error}')
+        raise ConnectionError(f'Ошибка при запросе {ENDPOINT} '
+                              f'c from_date={current_timestamp}: {error}')
 
 
 def check_response(response):
     """Проверяет корректность ответа API."""
     logging.info('Начало получение ответа от сервера')
-    if not isinstance(response, dict):
-        raise TypeError(f'Неверный формат данных {response}')
-    homework_list = response.get('homeworks')
-    current_date = response.get('current_date')
-    if homework_list is None:
-        raise KeyError(f'Ключ {homework_list} либо отстуствует '
-                       'на сервере, либо имеет другое значение или формат')
-    if current_date is None:
-        raise TelegramSendMessageError(
-            f'Ключ {current_date} либо отстуствует '
-            'на сервере, либо имеет другое значение или формат'
-        )
-    if not isinstance(homework_list, list):
-        raise TypeError(f'Неверный формат данных {homework_list}')
-    return homework_list
+    return validate_response(response)['homeworks']
 
 
 def parse_status(homework):
     """Извелкает информацию о статусе домашки."""
-    homework_name = homework.get('homework_name')
-    homework_status = homework.get('status')
-    if homework_name is None:
-        raise KeyError(f'Запрашиваемый ключ {homework_name} '
-                       f'имеет другое значение. Проверьте')
-    if homework_status not in HOMEWORK_VERDICTS:
-        raise ValueError(f'Такого значения: {homework_status}, '
-                         f'нет в списке {HOMEWORK_VERDICTS}')
-    verdict = HOMEWORK_VERDICTS[homework_status]
+    validate_homework(homework)
+    homework_name = homework['homework_name']
+    verdict = HOMEWORK_VERDICTS[homework['status']]
     return f'Изменился статус проверки работы "{homework_name}". {verdict}'
 
 
+def send_entry(bot, outbox, chat_id, keys, message):
+    """Отправляет одно сообщение очереди и отмечает результат.
+
+    Возвращает False, если Telegram отверг сообщение окончательно и оно
+    отложено в сторону. При сетевой ошибке бросает
+    TelegramSendMessageError.
+    """
+    try:
+        bot.send_message(chat_id, message)
+    except (BadRequest, Unauthorized):
+        outbox.mark_rejected(keys)
+        logging.error(
+            f'Telegram отверг сообщение {keys}, оно не будет '
+            'отправлено повторно: ', exc_info=True
+        )
+        return False
+    except TelegramError:
+        outbox.mark_failed(keys)
+        raise TelegramSendMessageError(
+            'Произошла ошибка отправки сообщения, подробности: ',
+            sys.exc_info()
+        )
+    outbox.mark_delivered(keys)
+    return True
+
+
+def drain_outbox(bot, outbox, deadline=None, stop=None,
+                 progress=lambda: None, flush=False):
+    """Отправляет накопленные в очереди сообщения.
+
+    В режиме сводок сообщения одного чата объединяются и уходят не чаще
+    раза в DIGEST_INTERVAL секунд; с `flush` сводки уходят сразу, не
+    дожидаясь интервала. Если задан `deadline` по часам
+    `time.monotonic`, отправка прекращается после него, а если передано
+    событие `stop` — как только оно взведено. Сообщение, которое
+    Telegram отверг окончательно, откладывается в сторону, и отправка
+    продолжается; при сетевой ошибке она прерывается до следующего цикла.
+    После каждого обработанного сообщения вызывается `progress`.
+    Возвращает число сделанных отправок.
+    """
+    delivered = 0
+    limit = -1 if DIGEST_INTERVAL else OUTBOX_BATCH_SIZE
+    max_size = DIGEST_MAX_SIZE if DIGEST_INTERVAL else 1
+    interval = 0 if flush else DIGEST_INTERVAL
+    while True:
+        batch = outbox.pending(limit)
+        sends = group_messages(batch, time.time(), interval,
+                               max_size, DIGEST_URGENT)
+        for chat_id, keys, message in sends:
+            if deadline is not None and time.monotonic() > deadline:
+                return delivered
+            if stop is not None and stop.is_set():
+                return delivered
+            delivered += send_entry(bot, outbox, chat_id, keys, message)
+            progress()
+        if limit < 0 or len(batch) < limit:
+            break
+    outbox.prune(time.time() - OUTBOX_RETENTION)
+    return delivered
+
+
 def check_tokens():
     """Проверяет наличие всех токенов."""
     return PRACTICUM_TOKEN and TELEGRAM_TOKEN and TELEGRAM_CHAT_ID
 
 
+def poll_homeworks(current_timestamp, outbox, status_table):
+    """Опрашивает API и складывает изменившиеся статусы в очередь.
+
+    Статус записывается в таблицу только после того, как уведомление о
+    нём сохранено. Домашка, которая не прошла проверку, пропускается и не
+    мешает остальным.
+    """
+    response = get_api_answer(current_timestamp)
+    for homework in status_table.changes(check_response(response)):
+        try:
+            message = parse_status(homework)
+        except ResponseValidationError as error:
+            logging.error(f'Пропущена некорректная домашка: {error}')
+            continue
+        outbox.put(make_key(homework), TELEGRAM_CHAT_ID,
+                   homework.get('status'), message)
+        status_table.commit(homework)
+    current_timestamp = response.get('current_date', current_timestamp)
+    outbox.set_state('current_timestamp', current_timestamp)
+    return current_timestamp
+
+
+def start_heartbeat():
+    """Создаёт heartbeat цикла и поднимает сервер проверок, если нужно."""
+    heartbeat = Heartbeat(HEALTH_MAX_BUSY)
+    if HEALTH_PORT:
+        serve_health(heartbeat, int(HEALTH_PORT))
+    return heartbeat
+
+
+def deliver(bot, outbox, heartbeat, stop):
+    """Досылает очередь независимо от того, удался ли опрос.
+
+    Каждая отправка продлевает heartbeat, поэтому длинная очередь не
+    выглядит зависанием. После сигнала остановки отправка прерывается:
+    остаток досылает `shutdown` с ограничением по времени.
+    """
+    try:
+        if drain_outbox(bot, outbox, stop=stop, progress=heartbeat.busy):
+            heartbeat.sent()
+    except TelegramSendMessageError:
+        logging.error(
+            'Произошла ошибка отправки сообщения, подробности: ',
+            exc_info=True
+        )
+
+
+def handle_stop_signals():
+    """Возвращает событие, которое взводится по SIGTERM или SIGINT."""
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *args: stop.set())
+    return stop
+
+
+def shutdown(bot, outbox):
+    """Досылает очередь и сохраняет состояние перед выходом.
+
+    Накопленные сводки уходят, не дожидаясь интервала: после перезапуска
+    на Heroku база с очередью может пропасть.
+    """
+    logging.info('Получен сигнал остановки, досылаем сообщения')
+    try:
+        drain_outbox(bot, outbox, time.monotonic() + SHUTDOWN_TIMEOUT,
+                     flush=True)
+    except TelegramSendMessageError:
+        logging.error(
+            'Произошла ошибка отправки сообщения, подробности: ',
+            exc_info=True
+        )
+    logging.info(f'В очереди осталось сообщений: {outbox.count_pending()}')
+    outbox.close()
+
+
 def main():
     """Основная логика работы бота."""
     critical_msg = ('Отсутсвует один из элементов '
                     f'{PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID}')
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    current_timestamp = int(time.time())
     if not check_tokens():
         logging.critical(critical_msg)
         sys.exit(critical_msg)
-    while True:
-        try:
-            response = get_api_answer(current_timestamp)
-            current_timestamp = response.get('current_date',
-                                             current_timestamp)
-            homework_list = check_response(response)
-            if len(homework_list) > 0:
-                message = parse_status(homework_list[0])
-                bot.send_message(TELEGRAM_CHAT_ID, message)
-        except TelegramSendMessageError:
-            logging.error(
-                'Произошла ошибка отправки сообщения, подробности: ',
-                exc_info=True
-            )
-        except Exception as error:
-            logging.error(f'Сбой в работе программы: {error}')
-            message = (f'Сбой в работе программы: {error}')
-            bot.send_message(TELEGRAM_CHAT_ID, message)
-        finally:
-            time.sleep(RETRY_TIME)
+    stop = handle_stop_signals()
+    outbox = Outbox(OUTBOX_PATH)
+    current_timestamp = outbox.get_state('current_timestamp',
+                                         int(time.time()))
+    status_table = StatusTable(HOMEWORK_VERDICTS)
+    heartbeat = start_heartbeat()
+    scheduler = Scheduler(sleep=stop.wait)
+    scheduler.add(DEFAULT_SUBSCRIPTION, 0)
+    while not stop.is_set():
+        for subscription in scheduler.wait():
+            if stop.is_set():
+                break
+            heartbeat.busy()
+            scheduler.add(subscription, RETRY_TIME)
+            credentials.reload()
+            try:
+                if not credentials.is_paused():
+                    current_timestamp = poll_homeworks(
+                        current_timestamp, outbox, status_table
+                    )
+                    heartbeat.polled()
+            except UnauthorizedError as error:
+                credentials.pause()
+                report_error(bot, 'Токен Практикума отклонён, опрос '
+                                  f'отложен до его замены: {error}')
+            except Exception as error:
+                report_error(bot, f'Сбой в работе программы: {error}')
+            deliver(bot, outbox, heartbeat, stop)
+        heartbeat.set_gauge('outbox_pending', outbox.count_pending())
+        heartbeat.idle(scheduler.next_deadline())
+    shutdown(bot, outbox)
 
 
 if __name__ == '__main__':
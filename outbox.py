@@ -0,0 +1,134 @@
+import json
+import sqlite3
+import time
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS outbox (
+    key TEXT PRIMARY KEY,
+    chat_id TEXT NOT NULL,
+    status TEXT,
+    message TEXT NOT NULL,
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    delivered REAL,
+    rejected REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_pending
+    ON outbox (delivered, created);
+CREATE TABLE IF NOT EXISTS state (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+'''
+
+
+def make_key(homework):
+    """Собирает ключ идемпотентности для статуса домашки."""
+    homework_id = homework.get('id', homework.get('homework_name'))
+    return ':'.join(str(part) for part in (
+        homework_id, homework.get('status'), homework.get('date_updated', '')
+    ))
+
+
+class Outbox:
+    """Постоянная очередь исходящих сообщений.
+
+    Сообщение сначала сохраняется, а помечается доставленным только после
+    успешной отправки, поэтому после перезапуска оно будет отправлено снова.
+    Повторная запись с тем же ключом игнорируется. Сообщение, которое
+    Telegram отверг окончательно, больше не выдаётся в `pending` и
+    хранится до очистки; временные сбои только увеличивают `attempts`.
+    """
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        columns = {row[1] for row in self.connection.execute(
+            'PRAGMA table_info(outbox)'
+        )}
+        if 'rejected' not in columns:
+            self.connection.execute(
+                'ALTER TABLE outbox ADD COLUMN rejected REAL'
+            )
+
+    def put(self, key, chat_id, status, message):
+        """Кладёт сообщение в очередь, если такого ключа ещё не было."""
+        with self.connection:
+            cursor = self.connection.execute(
+                'INSERT OR IGNORE INTO outbox '
+                '(key, chat_id, status, message, created) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, str(chat_id), status, message, time.time())
+            )
+        return cursor.rowcount > 0
+
+    def pending(self, limit=-1):
+        """Возвращает пачку недоставленных сообщений в порядке записи.
+
+        При отрицательном `limit` возвращаются все сообщения.
+        """
+        return self.connection.execute(
+            'SELECT key, chat_id, status, message, created FROM outbox '
+            'WHERE delivered IS NULL AND rejected IS NULL '
+            'ORDER BY created, rowid LIMIT ?',
+            (limit,)
+        ).fetchall()
+
+    def count_pending(self):
+        """Возвращает число недоставленных сообщений."""
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM outbox '
+            'WHERE delivered IS NULL AND rejected IS NULL'
+        ).fetchone()[0]
+
+    def mark_delivered(self, keys):
+        """Помечает сообщения доставленными."""
+        with self.connection:
+            self.connection.executemany(
+                'UPDATE outbox SET delivered = ? WHERE key = ?',
+                [(time.time(), key) for key in keys]
+            )
+
+    def mark_failed(self, keys):
+        """Учитывает неудачную попытку отправки."""
+        with self.connection:
+            self.connection.executemany(
+                'UPDATE outbox SET attempts = attempts + 1 WHERE key = ?',
+                [(key,) for key in keys]
+            )
+
+    def mark_rejected(self, keys):
+        """Откладывает сообщения, которые Telegram не примет никогда."""
+        with self.connection:
+            self.connection.executemany(
+                'UPDATE outbox SET attempts = attempts + 1, rejected = ? '
+                'WHERE key = ?',
+                [(time.time(), key) for key in keys]
+            )
+
+    def prune(self, before):
+        """Удаляет доставленные и отвергнутые сообщения старше `before`."""
+        with self.connection:
+            self.connection.execute(
+                'DELETE FROM outbox WHERE delivered < ? OR rejected < ?',
+                (before, before)
+            )
+
+    def get_state(self, name, default=None):
+        """Возвращает сохранённое значение состояния бота."""
+        row = self.connection.execute(
+            'SELECT value FROM state WHERE name = ?', (name,)
+        ).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def set_state(self, name, value):
+        """Сохраняет значение состояния бота."""
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO state (name, value) VALUES (?, ?)',
+                (name, json.dumps(value))
+            )
+
+    def close(self):
+        """Закрывает соединение с базой."""
+        self.connection.close()
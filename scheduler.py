@@ -0,0 +1,72 @@
+import heapq
+import itertools
+import time
+
+
+class Scheduler:
+    """Планировщик ближайших опросов для подписок.
+
+    Сроки лежат в куче, а отмена только помечает запись, поэтому она
+    выполняется за O(1). Помеченные записи выбрасываются, когда доходят до
+    вершины кучи или когда их становится больше половины.
+    """
+
+    def __init__(self, clock=time.monotonic, sleep=time.sleep):
+        self.clock = clock
+        self.sleep = sleep
+        self.queue = []
+        self.entries = {}
+        self.counter = itertools.count()
+        self.cancelled = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, key, delay):
+        """Назначает опрос подписки через `delay` секунд."""
+        self.cancel(key)
+        entry = [self.clock() + delay, next(self.counter), key]
+        self.entries[key] = entry
+        heapq.heappush(self.queue, entry)
+
+    def cancel(self, key):
+        """Отменяет назначенный опрос подписки."""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        entry[-1] = None
+        self.cancelled += 1
+        if self.cancelled > len(self.queue) // 2:
+            self.queue = list(self.entries.values())
+            heapq.heapify(self.queue)
+            self.cancelled = 0
+
+    def next_deadline(self):
+        """Возвращает ближайший срок или None, если опросов нет."""
+        queue = self.queue
+        while queue and queue[0][-1] is None:
+            heapq.heappop(queue)
+            self.cancelled -= 1
+        return queue[0][0] if queue else None
+
+    def due(self):
+        """Забирает из расписания подписки, срок которых наступил."""
+        now = self.clock()
+        keys = []
+        while True:
+            deadline = self.next_deadline()
+            if deadline is None or deadline > now:
+                return keys
+            key = heapq.heappop(self.queue)[-1]
+            del self.entries[key]
+            keys.append(key)
+
+    def wait(self):
+        """Спит до ближайшего срока и возвращает наступившие подписки."""
+        deadline = self.next_deadline()
+        if deadline is None:
+            return []
+        delay = deadline - self.clock()
+        if delay > 0:
+            self.sleep(delay)
+        return self.due()
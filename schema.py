@@ -0,0 +1,153 @@
+from exceptions import ResponseKeyError, ResponseTypeError, ResponseValueError
+
+
+def _type_error(path, expected, value):
+    return (ResponseTypeError, path,
+            f'ожидался {expected.__name__}, получен {type(value).__name__}')
+
+
+def _is_known(value, allowed):
+    try:
+        return value in allowed
+    except TypeError:
+        return False
+
+
+def _check_dict(schema):
+    fields = [(key, _compile_check(field)) for key, field in schema.items()]
+
+    def check(value, path, errors):
+        if not isinstance(value, dict):
+            errors.append(_type_error(path, dict, value))
+            return
+        for key, check_field in fields:
+            field_path = f'{path}[{key!r}]'
+            if key in value:
+                check_field(value[key], field_path, errors)
+            else:
+                errors.append((ResponseKeyError, field_path,
+                               'ключ отсутствует'))
+
+    return check
+
+
+def _check_list(schema):
+    check_item = _compile_check(schema[0])
+
+    def check(value, path, errors):
+        if not isinstance(value, list):
+            errors.append(_type_error(path, list, value))
+            return
+        for index, item in enumerate(value):
+            check_item(item, f'{path}[{index}]', errors)
+
+    return check
+
+
+def _check_choice(schema):
+    allowed = frozenset(schema)
+
+    def check(value, path, errors):
+        if not _is_known(value, allowed):
+            errors.append((ResponseValueError, path, f'значение {value!r} '
+                           f'не входит в {sorted(allowed)}'))
+
+    return check
+
+
+def _check_type(schema):
+
+    def check(value, path, errors):
+        if not isinstance(value, schema):
+            errors.append(_type_error(path, schema, value))
+
+    return check
+
+
+def _compile_check(schema):
+    """Собирает проверку, которая записывает ошибки с путями до них."""
+    if isinstance(schema, dict):
+        return _check_dict(schema)
+    if isinstance(schema, list):
+        return _check_list(schema)
+    if isinstance(schema, (set, frozenset)):
+        return _check_choice(schema)
+    if isinstance(schema, type):
+        return _check_type(schema)
+    raise TypeError(f'Неизвестный элемент схемы: {schema!r}')
+
+
+def _contains(allowed):
+    def test(value):
+        try:
+            return value in allowed
+        except TypeError:
+            return False
+
+    return test
+
+
+def _test_dict(schema):
+    fields = [(key, _compile_test(field)) for key, field in schema.items()]
+
+    def test(value):
+        if not isinstance(value, dict):
+            return False
+        for key, test_field in fields:
+            if key not in value or not test_field(value[key]):
+                return False
+        return True
+
+    return test
+
+
+def _test_list(schema):
+    test_item = _compile_test(schema[0])
+
+    def test(value):
+        return isinstance(value, list) and all(map(test_item, value))
+
+    return test
+
+
+def _compile_test(schema):
+    """Собирает проверку без путей, которая только отвечает, верно ли значение.
+
+    Листья схемы проверяются встроенными методами, поэтому список типов
+    проверяется одним вызовом `map` без байт-кода на каждый элемент.
+    """
+    if isinstance(schema, dict):
+        return _test_dict(schema)
+    if isinstance(schema, list):
+        return _test_list(schema)
+    if isinstance(schema, (set, frozenset)):
+        return _contains(frozenset(schema))
+    if isinstance(schema, type):
+        return schema.__instancecheck__
+    raise TypeError(f'Неизвестный элемент схемы: {schema!r}')
+
+
+def compile_schema(schema, name='response'):
+    """Собирает из схемы функцию, проверяющую значение за один проход.
+
+    Схема описывается словарём обязательных ключей, списком из одной схемы
+    элемента, множеством допустимых значений или типом. Значение сначала
+    проверяется без построения путей; только если оно неверно, ошибки
+    собираются целиком с путями от `name`, а тип исключения берётся по
+    первой из них.
+    """
+    test = _compile_test(schema)
+    check = _compile_check(schema)
+
+    def validate(value):
+        if test(value):
+            return value
+        errors = []
+        check(value, name, errors)
+        if errors:
+            raise errors[0][0](
+                [(path, message) for _, path, message in errors]
+            )
+        return value
+
+    return validate
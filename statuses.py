@@ -0,0 +1,56 @@
+from array import array
+
+UNKNOWN_STATUS = 0
+
+
+class StatusTable:
+    """Таблица последних известных статусов домашек.
+
+    Статусы хранятся колонкой однобайтовых кодов, а рядом лежит колонка
+    хешей `date_updated`, поэтому повторный вердикт с новой датой тоже
+    считается изменением. Домашке соответствует номер строки, так что
+    таблица на сотни тысяч подписок занимает несколько мегабайт, а цена
+    опроса зависит только от размера пришедшего ответа.
+    """
+
+    def __init__(self, statuses):
+        self.codes = {
+            status: code for code, status in enumerate(statuses, 1)
+        }
+        self.rows = {}
+        self.column = array('B')
+        self.updated = array('q')
+
+    def __len__(self):
+        return len(self.column)
+
+    def changes(self, homeworks):
+        """Возвращает домашки, статус которых отличается от записанного.
+
+        Таблица при этом не меняется: новый статус записывается через
+        `commit`, когда уведомление о нём уже сохранено.
+        """
+        rows, codes = self.rows, self.codes
+        column, updated = self.column, self.updated
+        changed = []
+        for homework in homeworks:
+            row = rows.get(homework.get('id', homework.get('homework_name')))
+            code = codes.get(homework.get('status'), UNKNOWN_STATUS)
+            if (row is None or column[row] != code
+                    or updated[row] != hash(homework.get('date_updated'))):
+                changed.append(homework)
+        return changed
+
+    def commit(self, homework):
+        """Записывает статус домашки в таблицу."""
+        key = homework.get('id', homework.get('homework_name'))
+        code = self.codes.get(homework.get('status'), UNKNOWN_STATUS)
+        date_hash = hash(homework.get('date_updated'))
+        row = self.rows.get(key)
+        if row is None:
+            self.rows[key] = len(self.column)
+            self.column.append(code)
+            self.updated.append(date_hash)
+        else:
+            self.column[row] = code
+            self.updated[row] = date_hash
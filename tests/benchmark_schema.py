@@ -0,0 +1,84 @@
+"""Сравнивает скорость проверки схемы с прежними ручными проверками.
+
+Запуск из корня репозитория: python tests/benchmark_schema.py --repeat 10
+"""
+import argparse
+import sys
+import timeit
+from os.path import abspath, dirname
+
+sys.path.append(dirname(dirname(abspath(__file__))))
+
+import homework  # noqa: E402
+
+
+def manual_check_response(response):
+    """Проверка ответа в том виде, в каком она была до схемы."""
+    if not isinstance(response, dict):
+        raise TypeError(f'Неверный формат данных {response}')
+    homework_list = response.get('homeworks')
+    current_date = response.get('current_date')
+    if homework_list is None:
+        raise KeyError(f'Ключ {homework_list} отсутствует')
+    if current_date is None:
+        raise KeyError(f'Ключ {current_date} отсутствует')
+    if not isinstance(homework_list, list):
+        raise TypeError(f'Неверный формат данных {homework_list}')
+    return homework_list
+
+
+def manual_check_homework(homework_data):
+    """Проверка домашки в том виде, в каком она была до схемы."""
+    homework_name = homework_data.get('homework_name')
+    homework_status = homework_data.get('status')
+    if homework_name is None:
+        raise KeyError(f'Запрашиваемый ключ {homework_name} отсутствует')
+    if homework_status not in homework.HOMEWORK_VERDICTS:
+        raise ValueError(f'Такого значения: {homework_status} нет')
+    return homework_data
+
+
+def make_response(size):
+    return {
+        'homeworks': [
+            {'id': number, 'homework_name': f'hw{number}',
+             'status': 'approved'}
+            for number in range(size)
+        ],
+        'current_date': 1,
+    }
+
+
+def run_benchmark(size, repeat=10):
+    """Возвращает время проверок ответа и всех его домашек в секундах."""
+    response = make_response(size)
+    homeworks = response['homeworks']
+
+    def measure(function):
+        return min(timeit.repeat(function, number=1, repeat=repeat))
+
+    return {
+        'response_manual': measure(lambda: manual_check_response(response)),
+        'response_schema': measure(
+            lambda: homework.validate_response(response)
+        ),
+        'homeworks_manual': measure(
+            lambda: list(map(manual_check_homework, homeworks))
+        ),
+        'homeworks_schema': measure(
+            lambda: list(map(homework.validate_homework, homeworks))
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--homeworks', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    for name, value in run_benchmark(args.homeworks, args.repeat).items():
+        print(f'{name}: {value:.6f}')
+
+
+if __name__ == '__main__':
+    main()
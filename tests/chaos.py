@@ -0,0 +1,238 @@
+"""Заглушки API Практикума и Telegram с задержками и сбоями.
+
+Все задержки не ждут по-настоящему, а сдвигают общие симулированные часы,
+поэтому часы работы бота проигрываются за секунды.
+"""
+import json
+from datetime import datetime, timezone
+from http import HTTPStatus
+
+import requests
+import telegram
+
+STATUSES = ['reviewing', 'approved', 'rejected']
+
+
+class SimulatedClock:
+
+    def __init__(self, start=1_600_000_000.0):
+        self.now = start
+        self.start = start
+
+    def time(self):
+        return self.now
+
+    def advance(self, delay):
+        self.now += max(delay, 0)
+
+
+def lognormal_latency(median, sigma):
+    """Возвращает генератор задержек с тяжёлым хвостом."""
+    def sample(rng):
+        return rng.lognormvariate(0, sigma) * median
+
+    return sample
+
+
+class ChaosBody:
+    """Тело ответа, которое читается через `read1`.
+
+    Если задан `delay`, каждый байт приходит через `delay` секунд, как у
+    медленного сервера.
+    """
+
+    def __init__(self, clock, data, delay=None):
+        self.clock = clock
+        self.data = data
+        self.delay = delay
+
+    def read1(self, amount, decode_content=None):
+        if self.delay is not None and self.data:
+            self.clock.advance(self.delay)
+            amount = 1
+        data, self.data = self.data[:amount], self.data[amount:]
+        return data
+
+
+class ChaosResponse:
+
+    def __init__(self, status_code, text, raw=None, on_close=None):
+        self.status_code = status_code
+        self.text = text
+        self.raw = raw
+        self.on_close = on_close
+        self._content = None
+
+    def json(self):
+        if self._content is not None:
+            return json.loads(self._content)
+        return json.loads(self.text)
+
+    def close(self):
+        if self.on_close is not None:
+            self.on_close()
+
+
+class ChaosPracticumAPI:
+    """Заглушка `ENDPOINT` с живым набором домашек.
+
+    Статусы домашек меняются случайно со средней частотой
+    `changes_per_hour`, и каждое изменение записывается в `events`, а
+    время выдачи каждого корректного ответа — в `served`.
+    Запрос может задержаться, упасть таймаутом (медленный ответ), вернуть
+    5xx (ошибки идут сериями), обрезанный JSON или ответ не по схеме, а
+    тело ответа может приходить по байту чуть быстрее таймаута чтения.
+    Самый долгий запрос вместе с чтением тела записывается в
+    `longest_request`.
+    Отдельная домашка в корректном ответе может прийти с неизвестным
+    статусом или без `homework_name`; такие изменения записываются в
+    `corrupted` как пары (время изменения, имя домашки).
+    """
+
+    def __init__(self, clock, rng, homeworks=50, changes_per_hour=20,
+                 latency=lognormal_latency(0.3, 1.0), error_rate=0.02,
+                 burst_length=5, truncated_rate=0.01, malformed_rate=0.01,
+                 bad_homework_rate=0.02, slowloris_rate=0.01,
+                 slowloris_length=1000):
+        self.clock = clock
+        self.rng = rng
+        self.latency = latency
+        self.error_rate = error_rate
+        self.burst_length = burst_length
+        self.truncated_rate = truncated_rate
+        self.malformed_rate = malformed_rate
+        self.bad_homework_rate = bad_homework_rate
+        self.slowloris_rate = slowloris_rate
+        self.slowloris_length = slowloris_length
+        self.change_interval = 3600 / changes_per_hour
+        self.homeworks = {
+            number: {'id': number, 'homework_name': f'hw{number}',
+                     'status': 'reviewing', 'updated': 0}
+            for number in range(homeworks)
+        }
+        self.events = []
+        self.served = []
+        self.corrupted = set()
+        self.longest_request = 0
+        self.slowloris = 0
+        self.next_change = clock.time()
+        self.burst_left = 0
+        self.calls = 0
+
+    def advance_world(self):
+        while self.next_change <= self.clock.time():
+            homework = self.homeworks[self.rng.randrange(len(self.homeworks))]
+            homework['status'] = self.rng.choice([
+                status for status in STATUSES if status != homework['status']
+            ])
+            homework['updated'] = self.next_change
+            self.events.append((self.next_change, homework['homework_name'],
+                                homework['status']))
+            self.next_change += self.rng.expovariate(1 / self.change_interval)
+
+    def payload(self, from_date):
+        homeworks = [
+            {
+                'id': homework['id'],
+                'homework_name': homework['homework_name'],
+                'status': homework['status'],
+                'date_updated': datetime.fromtimestamp(
+                    homework['updated'], timezone.utc
+                ).isoformat(),
+            }
+            for homework in self.homeworks.values()
+            if homework['updated'] >= from_date
+        ]
+        return {'homeworks': homeworks, 'current_date': int(self.clock.time())}
+
+    def corrupt_homeworks(self, homeworks):
+        """Портит случайные домашки ответа и запоминает их изменения."""
+        for homework in homeworks:
+            if self.rng.random() >= self.bad_homework_rate:
+                continue
+            name = homework['homework_name']
+            self.corrupted.add(
+                (self.homeworks[homework['id']]['updated'], name)
+            )
+            if self.rng.random() < 0.5:
+                homework['status'] = 'unknown'
+            else:
+                del homework['homework_name']
+
+    def finish(self, started):
+        self.longest_request = max(self.longest_request,
+                                   self.clock.time() - started)
+
+    def respond(self, started, stream, status_code, text, delay=None):
+        """Собирает ответ; без `stream` тело читается сразу, как в requests."""
+        response = ChaosResponse(
+            status_code, text,
+            raw=ChaosBody(self.clock, text.encode(), delay),
+            on_close=lambda: self.finish(started)
+        )
+        if not stream:
+            response._content = b''.join(
+                iter(lambda: response.raw.read1(8192), b'')
+            )
+            response.close()
+        return response
+
+    def get(self, url, headers=None, params=None, timeout=None,
+            stream=False):
+        self.calls += 1
+        started = self.clock.time()
+        delay = self.latency(self.rng)
+        if timeout is not None and delay > timeout:
+            self.clock.advance(timeout)
+            self.finish(started)
+            raise requests.Timeout('read timed out')
+        self.clock.advance(delay)
+        if self.rng.random() < self.slowloris_rate:
+            self.slowloris += 1
+            return self.respond(started, stream, HTTPStatus.OK,
+                                ' ' * self.slowloris_length, 0.9 * timeout)
+        self.advance_world()
+        if self.burst_left or self.rng.random() < self.error_rate:
+            self.burst_left = (self.burst_left or self.burst_length) - 1
+            return self.respond(started, stream, HTTPStatus.BAD_GATEWAY,
+                                'Bad Gateway')
+        payload = self.payload(params['from_date'])
+        text = json.dumps(payload)
+        if self.rng.random() < self.malformed_rate:
+            payload['homeworks'] = {'homeworks': payload['homeworks']}
+            text = json.dumps(payload)
+        elif self.rng.random() < self.truncated_rate:
+            text = text[:self.rng.randrange(len(text))]
+        else:
+            self.corrupt_homeworks(payload['homeworks'])
+            text = json.dumps(payload)
+            self.served.append(self.clock.time())
+        return self.respond(started, stream, HTTPStatus.OK, text)
+
+
+class ChaosTelegramBot:
+    """Заглушка Telegram.
+
+    Доставленные сообщения передаются в `on_message`, а по умолчанию
+    складываются в `sent`.
+    """
+
+    def __init__(self, clock, rng, latency=lognormal_latency(0.1, 0.5),
+                 error_rate=0.02, on_message=None):
+        self.clock = clock
+        self.rng = rng
+        self.latency = latency
+        self.error_rate = error_rate
+        self.sent = []
+        self.on_message = on_message or self.record
+        self.failures = 0
+
+    def record(self, sent_at, chat_id, text):
+        self.sent.append((sent_at, chat_id, text))
+
+    def send_message(self, chat_id, text):
+        self.clock.advance(self.latency(self.rng))
+        if self.rng.random() < self.error_rate:
+            self.failures += 1
+            raise telegram.error.NetworkError('chaos')
+        self.on_message(self.clock.time(), chat_id, text)
@@ -0,0 +1,236 @@
+"""Долгий прогон бота на симулированном времени под заглушками из chaos.py.
+
+Запуск из корня репозитория: python tests/soak.py --hours 24 --seed 1
+"""
+import argparse
+import bisect
+import gc
+import logging
+import random
+import re
+import sys
+import tracemalloc
+from os.path import abspath, dirname
+from unittest import mock
+
+sys.path.append(dirname(dirname(abspath(__file__))))
+
+import homework  # noqa: E402
+import chaos  # noqa: E402
+from chaos import (ChaosPracticumAPI, ChaosTelegramBot,  # noqa: E402
+                   SimulatedClock)
+from scheduler import Scheduler  # noqa: E402
+
+STATUS_MESSAGE = re.compile(
+    r'Изменился статус проверки работы "(?P<name>[^"]+)"\. (?P<verdict>.+)$',
+    re.MULTILINE
+)
+VERDICT_STATUSES = {
+    verdict: status for status, verdict in homework.HOMEWORK_VERDICTS.items()
+}
+
+
+def traced_memory():
+    """Считает память, выделенную ботом, без учёта заглушек и прогона."""
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, chaos.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ])
+    return sum(stat.size for stat in snapshot.statistics('filename'))
+
+
+class SimulatedStop:
+    """Событие остановки, ожидание которого сдвигает симулированные часы.
+
+    После `warm_at` один раз замеряет память, чтобы сравнить её с концом.
+    """
+
+    def __init__(self, clock, until, warm_at):
+        self.clock = clock
+        self.until = until
+        self.warm_at = warm_at
+        self.warm_memory = None
+
+    def is_set(self):
+        return self.clock.time() >= self.until
+
+    def set(self):
+        self.until = self.clock.time()
+
+    def wait(self, timeout):
+        if self.warm_memory is None and self.clock.time() >= self.warm_at:
+            self.warm_memory = traced_memory()
+        self.clock.advance(min(timeout, self.until - self.clock.time()))
+        return self.is_set()
+
+
+class Deliveries:
+    """Разбирает доставленные сообщения, не храня их тексты.
+
+    Тексты создаёт бот, поэтому их хранение выглядело бы как утечка
+    памяти в нём.
+    """
+
+    def __init__(self):
+        self.by_name = {}
+        self.messages = 0
+        self.error_reports = 0
+
+    def __call__(self, sent_at, chat_id, text):
+        self.messages += 1
+        self.error_reports += text.startswith('Сбой')
+        for match in STATUS_MESSAGE.finditer(text):
+            status = VERDICT_STATUSES.get(match['verdict'])
+            self.by_name.setdefault(match['name'], []).append(
+                (sent_at, status)
+            )
+
+
+def notification_delays(events, served, delivered, corrupted=frozenset()):
+    """Считает задержку уведомления для каждого заметного изменения.
+
+    Изменение заметно, если оно ещё было актуальным, когда API выдало
+    корректный ответ; изменения, перекрытые следующими до ближайшего
+    ответа, бот увидеть не мог, и они пропускаются. Изменения из
+    `corrupted` API выдало с испорченной домашкой, уведомить о них нельзя,
+    и они тоже пропускаются. Заметное изменение
+    считается доставленным, когда последнее сообщение о домашке
+    показывает этот статус, либо когда после смены статуса пришло любое
+    сообщение о ней. Для недоставленных изменений задержка равна None.
+    """
+    by_name = {}
+    for changed_at, name, status in events:
+        by_name.setdefault(name, []).append((changed_at, status))
+    delays = []
+    for name, changes in by_name.items():
+        messages = delivered.get(name, [])
+        times = [sent_at for sent_at, _ in messages]
+        for index, (changed_at, status) in enumerate(changes):
+            superseded_at = (changes[index + 1][0]
+                             if index + 1 < len(changes) else None)
+            seen = bisect.bisect_left(served, changed_at)
+            if (changed_at, name) in corrupted:
+                continue
+            if superseded_at is not None and (
+                seen == len(served) or served[seen] >= superseded_at
+            ):
+                continue
+            first = bisect.bisect_left(times, changed_at)
+            if first and messages[first - 1][1] == status:
+                delays.append((changed_at, 0))
+                continue
+            delay = None
+            for sent_at, sent_status in messages[first:]:
+                if sent_status == status or (
+                    superseded_at is not None and sent_at >= superseded_at
+                ):
+                    delay = sent_at - changed_at
+                    break
+            delays.append((changed_at, delay))
+    return delays
+
+
+def percentile(values, share):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def run_soak(hours, seed=0, slo=None, outbox_path=':memory:',
+             digest_interval=0, api_options=None, telegram_options=None):
+    """Гоняет `homework.main` `hours` часов симулированного времени.
+
+    Возвращает словарь с числом опросов и изменений статусов, пропущенными
+    уведомлениями, задержками, нарушениями SLO и ростом памяти.
+    """
+    slo = slo or 3 * homework.RETRY_TIME
+    rng = random.Random(seed)
+    clock = SimulatedClock()
+    api = ChaosPracticumAPI(clock, rng, **(api_options or {}))
+    delivered = Deliveries()
+    bot = ChaosTelegramBot(clock, rng, on_message=delivered,
+                           **(telegram_options or {}))
+    end = clock.time() + hours * 3600
+    stop = SimulatedStop(clock, end, clock.time() + hours * 360)
+    patches = [
+        mock.patch('time.time', clock.time),
+        mock.patch('time.monotonic', clock.time),
+        mock.patch.object(homework.requests, 'get', api.get),
+        mock.patch.object(homework.telegram, 'Bot', lambda token: bot),
+        mock.patch.object(homework, 'handle_stop_signals', lambda: stop),
+        mock.patch.object(homework, 'Scheduler', lambda sleep: Scheduler(
+            clock=clock.time, sleep=sleep
+        )),
+        mock.patch.object(homework, 'PRACTICUM_TOKEN', 'token'),
+        mock.patch.object(homework, 'TELEGRAM_TOKEN', '1234:abcdefg'),
+        mock.patch.object(homework, 'TELEGRAM_CHAT_ID', 12345),
+        mock.patch.object(homework, 'OUTBOX_PATH', outbox_path),
+        mock.patch.object(homework, 'HEALTH_PORT', None),
+        mock.patch.object(homework, 'DIGEST_INTERVAL', digest_interval),
+    ]
+    logging.disable(logging.CRITICAL)
+    tracemalloc.start()
+    try:
+        for patch in patches:
+            patch.start()
+        homework.main()
+        end_memory = traced_memory()
+    finally:
+        mock.patch.stopall()
+        tracemalloc.stop()
+        logging.disable(logging.NOTSET)
+
+    delays = notification_delays(api.events, api.served,
+                                 delivered.by_name, api.corrupted)
+    settled = [delay for changed_at, delay in delays
+               if changed_at <= end - slo]
+    notified = [delay for delay in settled if delay is not None]
+    return {
+        'hours': hours,
+        'polls': api.calls,
+        'status_changes': len(api.events),
+        'corrupted_changes': len(api.corrupted),
+        'observable_changes': len(delays),
+        'messages': delivered.messages,
+        'slowloris_responses': api.slowloris,
+        'longest_request': api.longest_request,
+        'telegram_failures': bot.failures,
+        'error_reports': delivered.error_reports,
+        'missed': len(settled) - len(notified),
+        'latency_p50': percentile(notified, 0.5),
+        'latency_p99': percentile(notified, 0.99),
+        'latency_max': max(notified, default=None),
+        'slo': slo,
+        'slo_violations': sum(delay > slo for delay in notified),
+        'memory_growth': end_memory - (stop.warm_memory or end_memory),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hours', type=float, default=24)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--slo', type=float, default=None)
+    parser.add_argument('--digest-interval', type=int, default=0)
+    parser.add_argument('--homeworks', type=int, default=50)
+    parser.add_argument('--changes-per-hour', type=float, default=20)
+    parser.add_argument('--error-rate', type=float, default=0.02)
+    parser.add_argument('--telegram-error-rate', type=float, default=0.02)
+    args = parser.parse_args()
+    report = run_soak(
+        args.hours, seed=args.seed, slo=args.slo,
+        digest_interval=args.digest_interval,
+        api_options={'homeworks': args.homeworks,
+                     'changes_per_hour': args.changes_per_hour,
+                     'error_rate': args.error_rate},
+        telegram_options={'error_rate': args.telegram_error_rate},
+    )
+    for name, value in report.items():
+        print(f'{name}: {value}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+import os
+from http import HTTPStatus
+
+import pytest
+import requests
+
+from credentials import Credentials
+from exceptions import UnauthorizedError
+
+
+def write_tokens(path, text, mtime):
+    path.write_text(text)
+    os.utime(path, ns=(mtime, mtime))
+
+
+class TestCredentials:
+
+    def test_environment_is_used_without_file(self, tmp_path):
+        credentials = Credentials(str(tmp_path / '.env'), environ={
+            'yandex_token': 'env-token',
+        })
+        assert credentials.headers() == {'Authorization': 'OAuth env-token'}
+
+    def test_environment_is_used_when_file_has_no_token(self, tmp_path):
+        path = tmp_path / '.env'
+        write_tokens(path, 'telegram_token=token\nchat_id=1\n', 1)
+        credentials = Credentials(str(path), environ={
+            'yandex_token': 'realtoken',
+        })
+        assert credentials.headers() == {'Authorization': 'OAuth realtoken'}
+
+    def test_file_token_overrides_environment(self, tmp_path):
+        path = tmp_path / '.env'
+        write_tokens(path, 'yandex_token=file-token\n', 1)
+        credentials = Credentials(str(path), environ={
+            'yandex_token': 'env-token',
+        })
+        assert credentials.headers() == {'Authorization': 'OAuth file-token'}
+
+        write_tokens(path, 'telegram_token=token\n', 2)
+        credentials.reload()
+        assert credentials.headers() == {'Authorization': 'OAuth env-token'}
+
+    def test_removed_token_is_not_kept(self, tmp_path):
+        path = tmp_path / '.env'
+        write_tokens(path, 'yandex_token=file-token\n', 1)
+        credentials = Credentials(str(path), environ={})
+
+        write_tokens(path, 'telegram_token=token\n', 2)
+        credentials.reload()
+        assert credentials.headers() == {'Authorization': 'OAuth '}, (
+            'Удалённый из файла токен не должен действовать дальше'
+        )
+
+    def test_reload_swaps_headers(self, tmp_path):
+        path = tmp_path / '.env'
+        write_tokens(path, 'yandex_token=first\n', 1)
+        credentials = Credentials(str(path), environ={})
+        before = credentials.headers()
+        assert not credentials.reload(), (
+            'Неизменившийся файл не должен перечитываться'
+        )
+
+        write_tokens(path, 'yandex_token=second\n', 2)
+        assert credentials.reload()
+        assert credentials.headers() == {'Authorization': 'OAuth second'}
+        assert before == {'Authorization': 'OAuth first'}
+
+    def test_pause_until_token_changes(self, tmp_path):
+        path = tmp_path / '.env'
+        write_tokens(path, 'yandex_token=revoked\n', 1)
+        credentials = Credentials(str(path), environ={})
+        credentials.pause()
+        assert credentials.is_paused()
+
+        write_tokens(path, 'yandex_token=revoked\n', 2)
+        credentials.reload()
+        assert credentials.is_paused(), (
+            'Подписка с тем же токеном должна оставаться отложенной'
+        )
+
+        write_tokens(path, 'yandex_token=fresh\n', 3)
+        credentials.reload()
+        assert not credentials.is_paused()
+
+    def test_get_api_answer_raises_on_401(self, monkeypatch):
+        class UnauthorizedResponse:
+            status_code = HTTPStatus.UNAUTHORIZED
+
+        monkeypatch.setattr(
+            requests, 'get', lambda **kwargs: UnauthorizedResponse()
+        )
+
+        import homework
+
+        with pytest.raises(UnauthorizedError):
+            homework.get_api_answer(0)
+
+    def test_get_api_answer_uses_current_token(self, tmp_path, monkeypatch):
+        import homework
+
+        requested = []
+
+        class OkResponse:
+            status_code = HTTPStatus.OK
+
+            def json(self):
+                return {'homeworks': [], 'current_date': 1}
+
+        def get(**kwargs):
+            requested.append(kwargs['headers'])
+            return OkResponse()
+
+        monkeypatch.setattr(requests, 'get', get)
+        monkeypatch.setattr(homework, 'credentials', Credentials(
+            str(tmp_path / '.env'), environ={}
+        ))
+        homework.get_api_answer(0)
+        assert requested == [{'Authorization': 'OAuth '}], (
+            'Без токена запрос не должен уходить со старым токеном'
+        )
+
+
+def test_get_api_answer_bounds_trickling_body(monkeypatch):
+    import homework
+
+    now = [0.0]
+
+    class TrickleRaw:
+
+        def read1(self, amount, decode_content=None):
+            now[0] += 1
+            return b' '
+
+    class TrickleResponse:
+        status_code = HTTPStatus.OK
+        raw = TrickleRaw()
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    response = TrickleResponse()
+    monkeypatch.setattr(requests, 'get', lambda **kwargs: response)
+    monkeypatch.setattr(homework.time, 'monotonic', lambda: now[0])
+    with pytest.raises(ConnectionError):
+        homework.get_api_answer(0)
+    assert now[0] <= homework.API_TIMEOUT + 1, (
+        'Тело ответа не должно читаться дольше API_TIMEOUT'
+    )
+    assert response.closed
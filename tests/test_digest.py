@@ -0,0 +1,83 @@
+from digest import DIGEST_HEADER, format_digest, group_messages
+from outbox import Outbox
+
+
+def entry(key, chat_id=1, status='approved', created=0):
+    return (key, chat_id, status, f'msg {key}', created)
+
+
+class RecordingBot:
+
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id, text):
+        self.sent.append((chat_id, text))
+
+
+class TestDigest:
+
+    def test_format_digest(self):
+        assert format_digest(['one']) == 'one'
+        assert format_digest(['one', 'two']) == '\n'.join([
+            DIGEST_HEADER.format(count=2), '• one', '• two'
+        ])
+
+    def test_buffer_until_interval(self):
+        entries = [entry('a', created=0), entry('b', created=50)]
+        assert group_messages(entries, now=99, interval=100,
+                              max_size=10) == []
+
+        sends = group_messages(entries, now=100, interval=100, max_size=10)
+        assert sends == [(1, ['a', 'b'], format_digest(['msg a', 'msg b']))]
+
+    def test_flush_when_buffer_is_full(self):
+        entries = [entry(str(number)) for number in range(5)]
+        sends = group_messages(entries, now=0, interval=100, max_size=2)
+        assert [keys for _, keys, _ in sends] == [['0', '1'], ['2', '3']], (
+            'Полный буфер должен уходить сразу, остаток ждать интервала'
+        )
+
+    def test_urgent_bypasses_buffer_per_chat(self):
+        entries = [
+            entry('a', chat_id=1),
+            entry('b', chat_id=2, status='rejected'),
+            entry('c', chat_id=2),
+        ]
+        sends = group_messages(entries, now=0, interval=100, max_size=10,
+                               urgent={'rejected'})
+        assert sends == [(2, ['b'], 'msg b')]
+
+    def test_drain_sends_one_message_per_chat(self, tmp_path, monkeypatch):
+        import homework
+
+        monkeypatch.setattr(homework, 'DIGEST_INTERVAL', 1)
+        monkeypatch.setattr(homework, 'DIGEST_MAX_SIZE', 100)
+        outbox = Outbox(str(tmp_path / 'outbox.sqlite3'))
+        for number in range(60):
+            outbox.put(str(number), number % 2, 'approved', f'msg {number}')
+        bot = RecordingBot()
+
+        monkeypatch.setattr(homework.time, 'time', lambda: 10 ** 10)
+        assert homework.drain_outbox(bot, outbox) == 2
+        assert sorted(chat_id for chat_id, _ in bot.sent) == ['0', '1']
+        assert outbox.count_pending() == 0
+        outbox.close()
+
+    def test_shutdown_flushes_pending_digest(self, tmp_path, monkeypatch):
+        import homework
+
+        path = str(tmp_path / 'outbox.sqlite3')
+        monkeypatch.setattr(homework, 'DIGEST_INTERVAL', 3600)
+        outbox = Outbox(path)
+        outbox.put('1', 1, 'approved', 'msg 1')
+        bot = RecordingBot()
+
+        homework.shutdown(bot, outbox)
+        assert bot.sent == [('1', 'msg 1')], (
+            'Несозревшая сводка должна уйти при остановке'
+        )
+        outbox = Outbox(path)
+        assert outbox.count_pending() == 0
+        outbox.close()
+
@@ -0,0 +1,83 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from health import Heartbeat, serve_health
+from outbox import Outbox
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestHealth:
+
+    def test_busy_loop_becomes_unhealthy(self):
+        clock = FakeClock()
+        heartbeat = Heartbeat(max_busy=60, clock=clock)
+        clock.now = 30
+        assert heartbeat.is_alive()
+        clock.now = 61
+        assert not heartbeat.is_alive(), (
+            'Цикл, занятый дольше max_busy, должен считаться зависшим'
+        )
+
+    def test_sleeping_loop_is_healthy_until_missed_wake(self):
+        clock = FakeClock()
+        heartbeat = Heartbeat(max_busy=60, clock=clock)
+        heartbeat.idle(600)
+        clock.now = 650
+        assert heartbeat.is_alive()
+        clock.now = 661
+        assert not heartbeat.is_alive()
+
+    def test_long_drain_keeps_loop_alive(self):
+        import homework
+
+        clock = FakeClock()
+        heartbeat = Heartbeat(max_busy=60, clock=clock)
+        outbox = Outbox(':memory:')
+        for number in range(100):
+            outbox.put(str(number), 1, 'approved', f'msg {number}')
+        alive = []
+
+        class SlowBot:
+
+            def send_message(self, chat_id, text):
+                clock.now += 10
+                alive.append(heartbeat.is_alive())
+
+        homework.deliver(SlowBot(), outbox, heartbeat, threading.Event())
+        assert len(alive) == 100 and all(alive), (
+            'Досылка очереди не должна выглядеть зависанием цикла'
+        )
+        assert outbox.count_pending() == 0
+        outbox.close()
+
+    def test_endpoints(self):
+        heartbeat = Heartbeat(max_busy=60)
+        heartbeat.set_gauge('outbox_pending', 3)
+        server = serve_health(heartbeat, 0, host='127.0.0.1')
+        url = f'http://127.0.0.1:{server.server_address[1]}'
+        try:
+            with urllib.request.urlopen(f'{url}/healthz') as response:
+                assert json.load(response)['outbox_pending'] == 3
+
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(f'{url}/readyz')
+            assert error.value.code == 503
+
+            heartbeat.polled()
+            with urllib.request.urlopen(f'{url}/readyz') as response:
+                assert json.load(response)['last_poll'] is not None
+        finally:
+            server.shutdown()
+            server.server_close()
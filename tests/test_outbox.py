@@ -0,0 +1,192 @@
+import sqlite3
+import threading
+
+import pytest
+import telegram
+
+from exceptions import TelegramSendMessageError
+from outbox import Outbox, make_key
+
+
+class FlakyBot:
+
+    def __init__(self, fail_on=(), reject=(), always_fail_on=()):
+        self.fail_on = set(fail_on)
+        self.reject = set(reject)
+        self.always_fail_on = set(always_fail_on)
+        self.sent = []
+
+    def send_message(self, chat_id, text):
+        if text in self.reject:
+            raise telegram.error.BadRequest('Message is too long')
+        if text in self.always_fail_on:
+            raise telegram.error.NetworkError('network')
+        if text in self.fail_on:
+            self.fail_on.discard(text)
+            raise telegram.TelegramError('network')
+        self.sent.append((chat_id, text))
+
+
+class TestOutbox:
+
+    @pytest.fixture
+    def outbox(self, tmp_path):
+        outbox = Outbox(str(tmp_path / 'outbox.sqlite3'))
+        yield outbox
+        outbox.close()
+
+    def test_put_is_idempotent(self, outbox):
+        homework = {'id': 1, 'status': 'approved', 'homework_name': 'hw'}
+        assert outbox.put(make_key(homework), 1, 'approved', 'msg')
+        assert not outbox.put(make_key(homework), 1, 'approved', 'msg'), (
+            'Повторная запись с тем же ключом не должна попадать в очередь'
+        )
+        assert outbox.count_pending() == 1
+
+    def test_pending_survives_restart(self, tmp_path):
+        path = str(tmp_path / 'outbox.sqlite3')
+        outbox = Outbox(path)
+        outbox.put('1:approved:', 1, 'approved', 'msg')
+        outbox.close()
+
+        outbox = Outbox(path)
+        assert [row[0] for row in outbox.pending(10)] == ['1:approved:']
+        outbox.mark_delivered(['1:approved:'])
+        assert outbox.pending(10) == []
+        outbox.close()
+
+    def test_drain_retries_failed_message(self, outbox, monkeypatch):
+        import homework
+
+        monkeypatch.setattr(homework, 'OUTBOX_BATCH_SIZE', 2)
+        for number in range(5):
+            outbox.put(str(number), 1, 'approved', f'msg {number}')
+        bot = FlakyBot(fail_on=['msg 3'])
+
+        with pytest.raises(TelegramSendMessageError):
+            homework.drain_outbox(bot, outbox)
+        assert [text for _, text in bot.sent] == ['msg 0', 'msg 1', 'msg 2']
+        assert outbox.count_pending() == 2
+
+        homework.drain_outbox(bot, outbox)
+        assert [text for _, text in bot.sent][3:] == ['msg 3', 'msg 4']
+        assert outbox.count_pending() == 0
+
+    def test_rejected_message_does_not_block_queue(self, outbox,
+                                                   monkeypatch):
+        import homework
+
+        monkeypatch.setattr(homework, 'OUTBOX_BATCH_SIZE', 2)
+        for number in range(5):
+            outbox.put(str(number), 1, 'approved', f'msg {number}')
+        bot = FlakyBot(reject=['msg 1'])
+
+        assert homework.drain_outbox(bot, outbox) == 4
+        assert [text for _, text in bot.sent] == [
+            'msg 0', 'msg 2', 'msg 3', 'msg 4'
+        ], 'Отвергнутое сообщение не должно задерживать следующие'
+        assert outbox.count_pending() == 0
+        assert homework.drain_outbox(bot, outbox) == 0
+
+    def test_network_failures_never_drop_message(self, outbox):
+        import homework
+
+        outbox.put('0', 1, 'approved', 'msg 0')
+        outbox.put('1', 1, 'approved', 'msg 1')
+        bot = FlakyBot(always_fail_on=['msg 0'])
+
+        for _ in range(100):
+            with pytest.raises(TelegramSendMessageError):
+                homework.drain_outbox(bot, outbox)
+        assert bot.sent == []
+        assert outbox.count_pending() == 2, (
+            'Сетевые сбои не должны выбрасывать сообщения из очереди'
+        )
+
+        bot.always_fail_on.clear()
+        assert homework.drain_outbox(bot, outbox) == 2
+        assert outbox.count_pending() == 0
+
+    def test_old_database_gets_rejected_column(self, tmp_path):
+        path = str(tmp_path / 'outbox.sqlite3')
+        connection = sqlite3.connect(path)
+        connection.execute(
+            'CREATE TABLE outbox (key TEXT PRIMARY KEY, chat_id TEXT NOT NULL,'
+            ' status TEXT, message TEXT NOT NULL, created REAL NOT NULL,'
+            ' attempts INTEGER NOT NULL DEFAULT 0, delivered REAL)'
+        )
+        connection.execute(
+            "INSERT INTO outbox (key, chat_id, message, created) "
+            "VALUES ('1', '1', 'msg', 0)"
+        )
+        connection.commit()
+        connection.close()
+
+        outbox = Outbox(path)
+        assert [row[0] for row in outbox.pending()] == ['1']
+        outbox.mark_rejected(['1'])
+        assert outbox.count_pending() == 0
+        outbox.close()
+
+    def test_state_survives_restart(self, tmp_path):
+        path = str(tmp_path / 'outbox.sqlite3')
+        outbox = Outbox(path)
+        assert outbox.get_state('current_timestamp', 1) == 1
+        outbox.set_state('current_timestamp', 1000)
+        outbox.close()
+
+        outbox = Outbox(path)
+        assert outbox.get_state('current_timestamp') == 1000
+        outbox.close()
+
+    def test_drain_stops_at_deadline(self, outbox):
+        import homework
+
+        outbox.put('1', 1, 'approved', 'msg')
+        bot = FlakyBot()
+        assert homework.drain_outbox(bot, outbox, deadline=0) == 0
+        assert outbox.count_pending() == 1
+
+    def test_drain_stops_on_stop_event(self, outbox):
+        import homework
+
+        outbox.put('1', 1, 'approved', 'msg')
+        stop = threading.Event()
+        stop.set()
+        assert homework.drain_outbox(FlakyBot(), outbox, stop=stop) == 0
+        assert outbox.count_pending() == 1
+
+    def test_main_drains_and_checkpoints_on_stop(self, tmp_path,
+                                                 monkeypatch):
+        import homework
+
+        path = str(tmp_path / 'outbox.sqlite3')
+        stop = threading.Event()
+        bot = FlakyBot()
+
+        def get_api_answer(current_timestamp):
+            stop.set()
+            return {
+                'homeworks': [{'id': 1, 'homework_name': 'hw',
+                               'status': 'reviewing'}],
+                'current_date': 1000,
+            }
+
+        for name, value in [('PRACTICUM_TOKEN', 'token'),
+                            ('TELEGRAM_TOKEN', '1234:abcdefg'),
+                            ('TELEGRAM_CHAT_ID', 12345),
+                            ('OUTBOX_PATH', path)]:
+            monkeypatch.setattr(homework, name, value)
+        monkeypatch.setattr(homework.telegram, 'Bot', lambda token: bot)
+        monkeypatch.setattr(homework, 'handle_stop_signals', lambda: stop)
+        monkeypatch.setattr(homework, 'get_api_answer', get_api_answer)
+
+        homework.main()
+
+        assert len(bot.sent) == 1, (
+            'Сообщение, полученное перед остановкой, должно уйти при выходе'
+        )
+        outbox = Outbox(path)
+        assert outbox.count_pending() == 0
+        assert outbox.get_state('current_timestamp') == 1000
+        outbox.close()
@@ -0,0 +1,72 @@
+import random
+
+from scheduler import Scheduler
+
+
+class SimulatedClock:
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = 0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.sleeps += 1
+        self.now += delay
+
+
+class TestScheduler:
+
+    def test_wait_returns_due_in_order(self):
+        clock = SimulatedClock()
+        scheduler = Scheduler(clock=clock, sleep=clock.sleep)
+        scheduler.add('b', 20)
+        scheduler.add('a', 10)
+        scheduler.add('c', 20)
+
+        assert scheduler.wait() == ['a']
+        assert clock.now == 10
+        assert scheduler.wait() == ['b', 'c']
+        assert clock.now == 20
+        assert scheduler.wait() == []
+
+    def test_cancel_and_reschedule(self):
+        clock = SimulatedClock()
+        scheduler = Scheduler(clock=clock, sleep=clock.sleep)
+        scheduler.add('a', 10)
+        scheduler.add('b', 15)
+        scheduler.cancel('a')
+        scheduler.add('b', 30)
+
+        assert len(scheduler) == 1
+        assert scheduler.wait() == ['b']
+        assert clock.now == 30
+
+    def test_many_subscriptions_wake_only_when_due(self):
+        clock = SimulatedClock()
+        scheduler = Scheduler(clock=clock, sleep=clock.sleep)
+        intervals = {}
+        rng = random.Random(0)
+        for key in range(10 ** 5):
+            intervals[key] = rng.choice([300, 600, 900, 1800])
+            scheduler.add(key, rng.randrange(1800))
+        for key in range(0, 10 ** 5, 2):
+            scheduler.cancel(key)
+        assert len(scheduler) == 10 ** 5 // 2
+
+        polls = 0
+        deadlines = set()
+        while clock.now < 3600:
+            deadline = scheduler.next_deadline()
+            for key in scheduler.wait():
+                assert key % 2, 'Отменённая подписка не должна опрашиваться'
+                polls += 1
+                deadlines.add(deadline)
+                scheduler.add(key, intervals[key])
+
+        assert clock.sleeps <= len(deadlines), (
+            'Планировщик должен просыпаться только к наступившему сроку'
+        )
+        assert polls >= 10 ** 5 // 2
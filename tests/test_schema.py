@@ -0,0 +1,68 @@
+import pytest
+
+from exceptions import (ResponseKeyError, ResponseTypeError,
+                        ResponseValidationError, ResponseValueError)
+from schema import compile_schema
+
+validate = compile_schema({
+    'homeworks': [{'homework_name': str, 'status': {'approved', 'rejected'}}],
+    'current_date': int,
+})
+
+
+class TestSchema:
+
+    def test_valid_response(self):
+        response = {
+            'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+            'current_date': 1,
+        }
+        assert validate(response) is response
+
+    def test_errors_are_collected_with_paths(self):
+        response = {
+            'homeworks': [
+                {'homework_name': 'hw', 'status': 'approved'},
+                {'status': 'unknown'},
+            ],
+        }
+        with pytest.raises(ResponseKeyError) as error:
+            validate(response)
+        assert error.value.errors == [
+            ("response['homeworks'][1]['homework_name']", 'ключ отсутствует'),
+            ("response['homeworks'][1]['status']",
+             "значение 'unknown' не входит в ['approved', 'rejected']"),
+            ("response['current_date']", 'ключ отсутствует'),
+        ]
+
+    @pytest.mark.parametrize('response, error_class', [
+        ([], ResponseTypeError),
+        ({'homeworks': {}, 'current_date': 1}, ResponseTypeError),
+        ({'homeworks': [[]], 'current_date': 1}, ResponseTypeError),
+        ({'homeworks': [], 'current_date': '1'}, ResponseTypeError),
+        ({'homeworks': []}, ResponseKeyError),
+        ({'homeworks': [{'homework_name': 'hw', 'status': []}],
+          'current_date': 1}, ResponseValueError),
+    ])
+    def test_error_types(self, response, error_class):
+        with pytest.raises(error_class) as error:
+            validate(response)
+        assert isinstance(error.value, ResponseValidationError)
+        assert str(error.value).startswith('response')
+
+    def test_paths_start_from_name(self):
+        validate_homework = compile_schema(
+            {'homework_name': str, 'status': {'approved'}}, name='homework'
+        )
+        with pytest.raises(ResponseValueError) as error:
+            validate_homework({'homework_name': 'hw', 'status': 'weird'})
+        assert error.value.errors == [
+            ("homework['status']", "значение 'weird' не входит в ['approved']"),
+        ]
+
+    def test_benchmark_runs(self):
+        from benchmark_schema import run_benchmark
+
+        report = run_benchmark(1000, repeat=1)
+        assert set(report) == {'response_manual', 'response_schema',
+                               'homeworks_manual', 'homeworks_schema'}
@@ -0,0 +1,46 @@
+import homework
+from soak import run_soak
+
+
+class TestSoak:
+
+    def test_bot_survives_chaos(self):
+        report = run_soak(24, seed=2, api_options={'error_rate': 0.05,
+                                                   'slowloris_rate': 0.05},
+                          telegram_options={'error_rate': 0.1})
+        assert report['polls'] >= 24 * 6
+        assert report['slowloris_responses'] > 0
+        assert report['longest_request'] <= (
+            homework.API_TIMEOUT + homework.API_READ_TIMEOUT
+        ), 'Медленный ответ не должен задерживать опрос дольше срока'
+        assert report['telegram_failures'] > 0
+        assert report['missed'] == 0, (
+            'Бот не должен терять уведомления при сбоях API и Telegram'
+        )
+        assert report['memory_growth'] < 100 * 1024
+
+    def test_calm_run_meets_slo(self):
+        report = run_soak(12, seed=0, api_options={
+            'error_rate': 0, 'truncated_rate': 0, 'malformed_rate': 0,
+            'bad_homework_rate': 0, 'slowloris_rate': 0,
+        }, telegram_options={'error_rate': 0})
+        assert report['missed'] == 0
+        assert report['error_reports'] == 0
+        assert report['slo_violations'] == 0
+
+    def test_bad_homeworks_do_not_hide_others(self):
+        report = run_soak(24, seed=1, api_options={'changes_per_hour': 60,
+                                                   'bad_homework_rate': 0.05})
+        assert report['corrupted_changes'] > 0
+        assert report['missed'] == 0, (
+            'Испорченная домашка не должна скрывать изменения соседних'
+        )
+
+    def test_digest_run(self):
+        report = run_soak(12, seed=1, digest_interval=3600,
+                          api_options={'homeworks': 200,
+                                       'changes_per_hour': 100})
+        assert report['missed'] == 0
+        assert report['messages'] < report['observable_changes'] / 5, (
+            'В режиме сводок сообщений должно быть меньше, чем изменений'
+        )
@@ -0,0 +1,98 @@
+from unittest import mock
+
+from outbox import Outbox
+from statuses import UNKNOWN_STATUS, StatusTable
+
+STATUSES = ['approved', 'reviewing', 'rejected']
+
+
+class TestStatusTable:
+
+    def test_changes_returns_only_changed(self):
+        table = StatusTable(STATUSES)
+        first = [
+            {'id': 1, 'status': 'reviewing'},
+            {'id': 2, 'status': 'reviewing'},
+        ]
+        assert table.changes(first) == first
+        for homework in first:
+            table.commit(homework)
+
+        second = [
+            {'id': 1, 'status': 'reviewing'},
+            {'id': 2, 'status': 'approved'},
+            {'id': 3, 'status': 'rejected'},
+        ]
+        assert table.changes(second) == second[1:], (
+            'Таблица должна возвращать только домашки с новым статусом'
+        )
+        for homework in second[1:]:
+            table.commit(homework)
+        assert len(table) == 3
+
+    def test_changes_do_not_touch_table(self):
+        table = StatusTable(STATUSES)
+        homework = {'id': 1, 'status': 'approved'}
+        assert table.changes([homework]) == [homework]
+        assert table.changes([homework]) == [homework], (
+            'Статус должен записываться только через commit'
+        )
+        assert len(table) == 0
+
+    def test_unknown_status_is_reported(self):
+        table = StatusTable(STATUSES)
+        homework = {'homework_name': 'hw', 'status': 'unknown'}
+        assert table.changes([homework]) == [homework]
+        table.commit(homework)
+        assert table.column[0] == UNKNOWN_STATUS
+
+    def test_large_table(self):
+        table = StatusTable(STATUSES)
+        for number in range(10 ** 5):
+            table.commit({'id': number, 'status': 'reviewing'})
+        changed = table.changes([{'id': 99999, 'status': 'approved'}])
+        assert changed == [{'id': 99999, 'status': 'approved'}]
+        assert table.column.itemsize == 1
+
+
+def test_bad_homework_does_not_block_others():
+    import homework
+
+    outbox = Outbox(':memory:')
+    table = StatusTable(homework.HOMEWORK_VERDICTS)
+    response = {
+        'homeworks': [
+            {'id': 1, 'homework_name': 'hw1', 'status': 'weird'},
+            {'id': 2, 'homework_name': 'hw2', 'status': 'approved'},
+        ],
+        'current_date': 100,
+    }
+    with mock.patch.object(homework, 'get_api_answer',
+                           return_value=response):
+        assert homework.poll_homeworks(0, outbox, table) == 100
+    messages = [row[3] for row in outbox.pending()]
+    assert messages == [
+        'Изменился статус проверки работы "hw2". '
+        + homework.HOMEWORK_VERDICTS['approved']
+    ], 'Некорректная домашка не должна мешать уведомлению о соседней'
+    assert table.changes(response['homeworks']) == response['homeworks'][:1]
+    outbox.close()
+
+
+def test_repeated_verdict_is_queued():
+    import homework
+
+    outbox = Outbox(':memory:')
+    table = StatusTable(homework.HOMEWORK_VERDICTS)
+    first = {'id': 1, 'homework_name': 'hw', 'status': 'rejected',
+             'date_updated': '2022-01-01T10:00:00Z'}
+    second = dict(first, date_updated='2022-01-02T10:00:00Z')
+    for response in ({'homeworks': [first], 'current_date': 1},
+                     {'homeworks': [second], 'current_date': 2}):
+        with mock.patch.object(homework, 'get_api_answer',
+                               return_value=response):
+            homework.poll_homeworks(0, outbox, table)
+    assert [row[0] for row in outbox.pending()] == [
+        '1:rejected:2022-01-01T10:00:00Z', '1:rejected:2022-01-02T10:00:00Z'
+    ], 'Повторный вердикт с новой датой должен попасть в очередь'
+    outbox.close()